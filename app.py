@@ -1,16 +1,40 @@
 import io
-import tempfile
 import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import datetime as dt
 from datetime import date
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-from fpdf import FPDF
+from matplotlib.figure import Figure
+from fpdf import FPDF, __version__ as FPDF_VERSION
+
+from fl_kernels import classify_kernel
 
 # ============ 基本設定 ============
 st.set_page_config(page_title="Liquefaction Report Generator", layout="wide")
 
+# 図の解像度（画面プレビュー用 / PDF 埋め込み用）
+PREVIEW_DPI = 90
+PDF_DPI = 150
+
+# 判定結果の区分（numba 版はこの並びのインデックスを返す）
+RISK_LEVELS = ("High", "Moderate", "Low", "Unknown")
+FOUNDATIONS = (
+    "Pile foundation + Ground improvement",
+    "Raft foundation + Partial improvement",
+    "Raft foundation + Monitoring",
+    "Spread/Strip foundation",
+    "Review required",
+)
+# これより多い行数のときだけ numba 版を使う（JIT の初回コンパイルが割に合わないため）
+NUMBA_MIN_ROWS = 5000
+
 # ============ ユーティリティ ============
 def compute_risk_level(fl: float) -> str:
     if pd.isna(fl):
@@ -22,62 +46,141 @@ def compute_risk_level(fl: float) -> str:
     else:
         return "Low"
 
+def compute_risk_levels(fl: pd.Series, nan_mask: np.ndarray = None) -> np.ndarray:
+    # compute_risk_level の列一括版（nan_mask は欠測判定を呼び出し側で 1 回だけ求めたもの）
+    fl = fl.to_numpy(dtype=float, na_value=np.nan)
+    if nan_mask is None:
+        nan_mask = np.isnan(fl)
+    return np.select(
+        [nan_mask, fl < 0.75, fl < 1.0],
+        [RISK_LEVELS[3], RISK_LEVELS[0], RISK_LEVELS[1]],
+        default=RISK_LEVELS[2],
+    )
+
 def suggest_foundation(fl: float, ground_type: str) -> str:
     if pd.isna(fl):
         return "Review required"
-    gt = (ground_type or "").lower()
+    # 文字列以外（None / NaN 等）の地盤種別は軟弱地盤でないものとして扱う
+    gt = ground_type.lower() if isinstance(ground_type, str) else ""
+    return _suggest_from_masks(fl, "soft" in gt)
+
+def _suggest_from_masks(fl: float, soft: bool) -> str:
+    # 軟弱地盤かどうかは呼び出し側で判定済み（文字列処理はここでは行わない）
+    if pd.isna(fl):
+        return "Review required"
     if fl < 0.75:
         return "Pile foundation + Ground improvement"
     elif fl < 1.0:
         return "Raft foundation + Partial improvement"
     else:
-        return "Spread/Strip foundation" if "soft" not in gt else "Raft foundation + Monitoring"
-
-def fig_to_png_bytes(fig) -> bytes:
+        return "Raft foundation + Monitoring" if soft else "Spread/Strip foundation"
+
+def suggest_foundations(fl: pd.Series, soft: np.ndarray, nan_mask: np.ndarray = None) -> np.ndarray:
+    # suggest_foundation の列一括版（soft は soft_ground_mask の結果）
+    fl = fl.to_numpy(dtype=float, na_value=np.nan)
+    if nan_mask is None:
+        nan_mask = np.isnan(fl)
+    return np.select(
+        [nan_mask, fl < 0.75, fl < 1.0, soft],
+        [FOUNDATIONS[4], FOUNDATIONS[0], FOUNDATIONS[1], FOUNDATIONS[2]],
+        default=FOUNDATIONS[3],
+    )
+
+def soft_ground_mask(ground_type: pd.Series) -> np.ndarray:
+    return ground_type.fillna("").astype(str).str.lower().str.contains("soft", regex=False).to_numpy(dtype=bool)
+
+def classify_numba(fl: pd.Series, soft: np.ndarray) -> tuple:
+    # compute_risk_levels / suggest_foundations を 1 回の並列ループで同時に求める
+    fl = fl.to_numpy(dtype=float, na_value=np.nan)
+    out_risk = np.empty(fl.size, dtype=np.int8)
+    out_sug = np.empty(fl.size, dtype=np.int8)
+    classify_kernel(fl, soft, out_risk, out_sug)
+    return np.array(RISK_LEVELS, dtype=object)[out_risk], np.array(FOUNDATIONS, dtype=object)[out_sug]
+
+def fig_to_png_bytes(fig, dpi: int = PDF_DPI) -> bytes:
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", dpi=200, bbox_inches="tight")
-    plt.close(fig)
+    # 単色主体の図なので圧縮は軽めにし、タイムスタンプ等のメタデータも書かない
+    fig.savefig(
+        buf,
+        format="png",
+        dpi=dpi,
+        bbox_inches="tight",
+        metadata={"Software": None},
+        pil_kwargs={"compress_level": 3, "optimize": False},
+    )
     buf.seek(0)
     return buf.read()
 
-def save_bytes_to_tmp_png(data: bytes) -> str:
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".png")
-    tmp.write(data)
-    tmp.flush()
-    return tmp.name
-
 # ============ 可視化（図表） ============
-def plot_fl_bar(df: pd.DataFrame) -> bytes:
-    ids = df["id"].astype(str).tolist()
-    fls = df["FL"].astype(float).tolist()
-    colors = ["#d62728" if x < 1.0 else "#2ca02c" for x in fls]
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    ax.bar(ids, fls, color=colors)
-    ax.axhline(1.0, color="gray", linestyle="--", linewidth=1)
-    ax.set_title("FL value by site")
-    ax.set_ylabel("FL")
-    ax.set_xlabel("Site ID")
-    ax.set_ylim(0, max(1.2, max(fls) + 0.1))
-    return fig_to_png_bytes(fig)
-
-def plot_locations_scatter(df: pd.DataFrame) -> bytes:
+# pyplot の状態を使わず Figure を直接作るので、別スレッドからも描画できる
+@st.cache_resource
+def _preview_canvas(key: str, figsize: tuple) -> tuple:
+    # プレビュー用の Figure/Axes は再実行をまたいで使い回す（全セッション共有なのでロック付き）
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots(), threading.Lock()
+
+@contextmanager
+def _axes(key: str, figsize: tuple, reuse: bool):
+    if not reuse:
+        fig = Figure(figsize=figsize)
+        yield fig, fig.subplots()
+        return
+    fig, ax, lock = _preview_canvas(key, figsize)
+    with lock:
+        ax.clear()
+        yield fig, ax
+
+def plot_fl_bar(df: pd.DataFrame, dpi: int = PDF_DPI, reuse: bool = False) -> bytes:
+    ids = df["id"].astype(str).to_numpy()
+    fls = df["FL"].to_numpy(dtype=float, na_value=np.nan)
+    colors = np.where(fls < 1.0, "#d62728", "#2ca02c")
+    # 空の表や全て NaN の場合でも上限を決められるようにする
+    fl_max = float(np.nanmax(fls)) if np.isfinite(fls).any() else 0.0
+
+    with _axes("bar", (8, 4), reuse) as (fig, ax):
+        ax.bar(ids, fls, color=colors)
+        ax.axhline(1.0, color="gray", linestyle="--", linewidth=1)
+        ax.set_title("FL value by site")
+        ax.set_ylabel("FL")
+        ax.set_xlabel("Site ID")
+        ax.set_ylim(0, max(1.2, fl_max + 0.1))
+        return fig_to_png_bytes(fig, dpi)
+
+def plot_locations_scatter(df: pd.DataFrame, dpi: int = PDF_DPI, reuse: bool = False) -> bytes:
     # lat/lon が無い場合は簡易図にフォールバック
     if not set(["lat", "lon"]).issubset(df.columns):
-        fig, ax = plt.subplots(figsize=(6, 4))
-        ax.text(0.5, 0.5, "No coordinates provided", ha="center", va="center", fontsize=14)
-        ax.axis("off")
-        return fig_to_png_bytes(fig)
-
-    fig, ax = plt.subplots(figsize=(6, 6))
-    ax.scatter(df["lon"], df["lat"], c="#1f77b4")
-    for _, r in df.iterrows():
-        ax.annotate(str(r["id"]), (r["lon"], r["lat"]), xytext=(3, 3), textcoords="offset points", fontsize=8)
-    ax.set_xlabel("Longitude")
-    ax.set_ylabel("Latitude")
-    ax.set_title("Site locations (scatter)")
-    ax.grid(True, alpha=0.3)
-    return fig_to_png_bytes(fig)
+        with _axes("no_coords", (6, 4), reuse) as (fig, ax):
+            ax.text(0.5, 0.5, "No coordinates provided", ha="center", va="center", fontsize=14)
+            ax.axis("off")
+            return fig_to_png_bytes(fig, dpi)
+
+    with _axes("scatter", (6, 6), reuse) as (fig, ax):
+        ax.scatter(df["lon"], df["lat"], c="#1f77b4")
+        ids = df["id"].astype(str).to_numpy()
+        for i, x, y in zip(ids, df["lon"].to_numpy(), df["lat"].to_numpy()):
+            ax.annotate(i, (x, y), xytext=(3, 3), textcoords="offset points", fontsize=8)
+        ax.set_xlabel("Longitude")
+        ax.set_ylabel("Latitude")
+        ax.set_title("Site locations (scatter)")
+        ax.grid(True, alpha=0.3)
+        return fig_to_png_bytes(fig, dpi)
+
+# 再実行ごとの描画を避けるため PNG をキャッシュする。キーは図に使う列の全行から求めた
+# data_key（プレビューの preview_key）と dpi だけにする。st.cache_data は大きな表を
+# 標本行でしかハッシュしないため、_df はハッシュ対象から外す
+@st.cache_data(show_spinner=False)
+def _cached_fl_bar_png(data_key: str, _df: pd.DataFrame, dpi: int) -> bytes:
+    return plot_fl_bar(_df, dpi, reuse=True)
+
+@st.cache_data(show_spinner=False)
+def _cached_locations_png(data_key: str, _df: pd.DataFrame, dpi: int) -> bytes:
+    return plot_locations_scatter(_df, dpi, reuse=True)
+
+def fl_bar_png(df: pd.DataFrame, data_key: str, dpi: int = PDF_DPI) -> bytes:
+    return _cached_fl_bar_png(data_key, df[["id", "FL"]], dpi)
+
+def locations_png(df: pd.DataFrame, data_key: str, dpi: int = PDF_DPI) -> bytes:
+    return _cached_locations_png(data_key, df[[c for c in ("id", "lat", "lon") if c in df.columns]], dpi)
 
 # ============ PDF Generation (fpdf2) ============
 # Use built-in Helvetica font for reliable PDF generation without external font files
@@ -144,47 +247,60 @@ def add_toc(pdf: Booklet, df: pd.DataFrame):
     pdf.cell(0, 10, "Table of Contents", ln=1)
     pdf.ln(2)
     pdf.set_font(PDF_FONT, size=12)
-    for i, r in enumerate(df.itertuples(), start=1):
-        line = f"{i}. {sanitize_text_for_pdf(r.id)} - {sanitize_text_for_pdf(r.ground_type)} - FL={r.FL}"
-        pdf.cell(0, 8, line, ln=1)
+    rows = df[["id", "ground_type", "FL"]].itertuples(index=False, name=None)
+    # 目次は 1 回の multi_cell で書き出す（改ページは auto_page_break に任せる）
+    toc = "\n".join(
+        f"{i}. {sanitize_text_for_pdf(site_id)} - {sanitize_text_for_pdf(ground_type)} - FL={fl}"
+        for i, (site_id, ground_type, fl) in enumerate(rows, start=1)
+    )
+    pdf.multi_cell(0, 8, toc, align="L")
 
 
-def add_overview_charts(pdf: Booklet, bar_png_path: str, loc_png_path: str):
+def add_overview_charts(pdf: Booklet, bar_png: bytes, loc_png: bytes):
     pdf.add_page()
     pdf.set_font(PDF_FONT, "B", 14)
     pdf.cell(0, 8, "Overview", ln=1)
     pdf.ln(2)
     y_start = pdf.get_y()
-    pdf.image(bar_png_path, x=10, y=y_start, w=90)
-    pdf.image(loc_png_path, x=110, y=y_start, w=90)
+    pdf.image(io.BytesIO(bar_png), x=10, y=y_start, w=90)
+    pdf.image(io.BytesIO(loc_png), x=110, y=y_start, w=90)
     pdf.ln(100)
 
 
 def add_site_pages(pdf: Booklet, df: pd.DataFrame):
-    for r in df.itertuples():
+    has_coords = "lat" in df.columns and "lon" in df.columns
+    # 無い列は NaN で埋めて、行を固定長のタプルとして展開する
+    cols = ["id", "lat", "lon", "ground_type", "FL", "risk_level", "suggestion", "note"]
+    rows = df.reindex(columns=cols).itertuples(index=False, name=None)
+    for site_id, lat, lon, ground_type, fl, risk_level, suggestion, note in rows:
         pdf.add_page()
         pdf.set_font(PDF_FONT, "B", 14)
-        pdf.cell(0, 8, f"Site ID: {sanitize_text_for_pdf(r.id)}", ln=1)
+        pdf.cell(0, 8, f"Site ID: {sanitize_text_for_pdf(site_id)}", ln=1)
         pdf.set_font(PDF_FONT, size=12)
-        if "lat" in df.columns and "lon" in df.columns:
-            pdf.cell(0, 7, f"Coordinates: {r.lat}, {r.lon}", ln=1)
-        pdf.cell(0, 7, f"Ground Type: {sanitize_text_for_pdf(r.ground_type)}", ln=1)
-        pdf.cell(0, 7, f"Corrected FL Value: {r.FL}", ln=1)
-        pdf.cell(0, 7, f"Risk Level: {sanitize_text_for_pdf(r.risk_level)}", ln=1)
-        pdf.multi_cell(0, 7, f"Design Recommendation: {sanitize_text_for_pdf(r.suggestion)}", align="L")
+        # 本文は 1 回の multi_cell でまとめて書き出す
+        lines = [f"Coordinates: {lat}, {lon}"] if has_coords else []
+        lines += [
+            f"Ground Type: {sanitize_text_for_pdf(ground_type)}",
+            f"Corrected FL Value: {fl}",
+            f"Risk Level: {sanitize_text_for_pdf(risk_level)}",
+            f"Design Recommendation: {sanitize_text_for_pdf(suggestion)}",
+        ]
+        pdf.multi_cell(0, 7, "\n".join(lines), align="L")
         pdf.ln(2)
-        pdf.set_font(PDF_FONT, "I", 11)
-        note = getattr(r, "note", "")
         if pd.notna(note) and str(note).strip():
+            pdf.set_font(PDF_FONT, "I", 11)
             pdf.multi_cell(0, 6, f"Remarks: {sanitize_text_for_pdf(note)}")
 
 
-def build_pdf_booklet(df: pd.DataFrame, project: str, author: str, report_date: str) -> bytes:
+def build_pdf_booklet(df: pd.DataFrame, project: str, author: str, report_date: str) -> bytearray:
     if df.empty:
         raise ValueError("Cannot generate report: No site data provided")
 
-    bar_png = save_bytes_to_tmp_png(plot_fl_bar(df))
-    loc_png = save_bytes_to_tmp_png(plot_locations_scatter(df))
+    # 2 つの図は互いに独立なので並行して描画する
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        fut_bar = ex.submit(plot_fl_bar, df, PDF_DPI)
+        fut_loc = ex.submit(plot_locations_scatter, df, PDF_DPI)
+        bar_png, loc_png = fut_bar.result(), fut_loc.result()
 
     pdf = Booklet(orientation="P", unit="mm", format="A4")
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -194,9 +310,89 @@ def build_pdf_booklet(df: pd.DataFrame, project: str, author: str, report_date:
     add_overview_charts(pdf, bar_png, loc_png)
     add_site_pages(pdf, df)
 
-    return bytes(pdf.output())
+    # fpdf2 の出力（bytearray）をコピーせずに返す
+    out = pdf.output()
+    return out if isinstance(out, bytearray) else bytearray(out)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_pdf(cache_key: str, _df: pd.DataFrame, project: str, author: str, report_date: str) -> bytes:
+    # 入力（編集後データ＋表紙情報）が同じなら前回の PDF をそのまま返す
+    # キャッシュキーは全行から求めた cache_key（_pdf_cache_key）だけにする。st.cache_data は
+    # 大きな表を標本行でしかハッシュしないため、_df はハッシュ対象から外す
+    # st.download_button は bytearray を受け付けないため、FPDF を解放した後に 1 回だけ bytes にする
+    return bytes(build_pdf_booklet(_df, project, author, report_date))
+
+
+# Streamlit を再起動しても PDF を再利用できるよう、ディスクにも保存する
+# （ディレクトリは丸ごと削除してよい。古いものから PDF_CACHE_MAX_FILES 件を超えた分は自動で消す）
+PDF_CACHE_DIR = Path(__file__).resolve().parent / ".pdf_cache"
+PDF_CACHE_MAX_FILES = 50
+# レイアウトや処理を変えたら古い PDF を返さないよう、アプリのソースと fpdf2 の版をキーに含める
+PDF_CACHE_VERSION = hashlib.sha256(Path(__file__).read_bytes() + FPDF_VERSION.encode()).hexdigest()
+
+
+def _pdf_cache_key(df: pd.DataFrame, project: str, author: str, report_date: str) -> str:
+    h = hashlib.sha256(PDF_CACHE_VERSION.encode())
+    h.update(b"\0" + df.to_csv(index=False).encode())
+    for part in (project, author, report_date):
+        h.update(b"\0" + part.encode())
+    return h.hexdigest()
+
+
+def _pdf_cache_get(key: str):
+    path = PDF_CACHE_DIR / f"{key}.pdf"
+    try:
+        data = path.read_bytes()
+        path.touch()  # 最近使ったものは削除対象から外す
+        return data
+    except OSError:
+        return None
+
+
+def _pdf_cache_put(key: str, data: bytes):
+    path = PDF_CACHE_DIR / f"{key}.pdf"
+    try:
+        PDF_CACHE_DIR.mkdir(exist_ok=True)
+        # 書きかけのファイルを読まれないよう、一時ファイルから置き換える
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+        # 件数の上限を超えたら、最後に使われたのが古いものから消す
+        files = sorted(PDF_CACHE_DIR.glob("*.pdf"), key=lambda p: p.stat().st_mtime)
+        for old in files[:-PDF_CACHE_MAX_FILES]:
+            old.unlink(missing_ok=True)
+    except OSError:
+        pass  # キャッシュに書けなくても PDF 自体は返す
 
 # ============ データ準備（サンプル or アップロード） ============
+def _differs_from_c_engine(df: pd.DataFrame) -> bool:
+    # pyarrow は重複した列名を FL.1 のように付け替えず、日付・時刻らしい文字列を
+    # datetime / date / time 型に変換してしまう。その場合は C エンジンの結果に合わせる
+    if not df.columns.is_unique:
+        return True
+    for col in df.columns:
+        s = df[col]
+        if s.dtype.kind in "mM":
+            return True
+        if s.dtype == object:
+            first = s.first_valid_index()
+            if first is not None and isinstance(s[first], (dt.date, dt.time)):
+                return True
+    return False
+
+def read_uploaded_csv(uploaded) -> pd.DataFrame:
+    # 高速なマルチスレッドの pyarrow パーサで読む（列は通常の numpy 型のまま）
+    # pyarrow が無い・解釈できない・C エンジンと結果が変わる CSV は既定の C エンジンで読み直す
+    try:
+        df = pd.read_csv(uploaded, engine="pyarrow")
+        if not _differs_from_c_engine(df):
+            return df
+    except (ImportError, ValueError):  # ArrowInvalid / ParserError は ValueError の派生
+        pass
+    uploaded.seek(0)
+    return pd.read_csv(uploaded)
+
 def get_sample_df() -> pd.DataFrame:
     return pd.DataFrame([
         {"id": "A01", "lat": 35.6895, "lon": 139.6917, "FL": 0.81, "ground_type": "Soft ground"},
@@ -204,17 +400,28 @@ def get_sample_df() -> pd.DataFrame:
         {"id": "A03", "lat": 35.6880, "lon": 139.6900, "FL": 0.95, "ground_type": "Soft ground"},
     ])
 
+def _recompute_derived(df: pd.DataFrame) -> pd.DataFrame:
+    # FL の型整形とリスク・提案の算出をまとめて 1 回で行う
+    df["FL"] = pd.to_numeric(df["FL"], errors="coerce")
+    # 地盤種別の小文字化・"soft" 判定は列全体で 1 回だけ行う
+    soft = soft_ground_mask(df["ground_type"])
+    if classify_kernel is not None and len(df) > NUMBA_MIN_ROWS:
+        df["risk_level"], df["suggestion"] = classify_numba(df["FL"], soft)
+    else:
+        # 欠測判定も列全体で 1 回だけ行い、両方の判定で使い回す
+        # isna() では拾えない NaN（Arrow 列の NaN 等）も含めるため、変換後の配列で判定する
+        nan_mask = np.isnan(df["FL"].to_numpy(dtype=float, na_value=np.nan))
+        df["risk_level"] = compute_risk_levels(df["FL"], nan_mask)
+        df["suggestion"] = suggest_foundations(df["FL"], soft, nan_mask)
+    return df
+
 def ensure_columns(df: pd.DataFrame) -> pd.DataFrame:
     # 必須列が無ければ追加
     for col in ["id", "FL", "ground_type"]:
         if col not in df.columns:
             df[col] = None
-    # 型整形
-    if "FL" in df.columns:
-        df["FL"] = pd.to_numeric(df["FL"], errors="coerce")
-    # リスク・提案を自動算出（上書き可能）
-    df["risk_level"] = df["FL"].apply(compute_risk_level)
-    df["suggestion"] = df.apply(lambda r: suggest_foundation(r["FL"], r.get("ground_type", "")), axis=1)
+    # 型整形・リスク・提案を自動算出（上書き可能）
+    df = _recompute_derived(df)
     if "note" not in df.columns:
         df["note"] = ""
     return df
@@ -233,7 +440,7 @@ with st.sidebar:
 
 uploaded = st.file_uploader("Upload CSV (UTF-8)", type=["csv"])
 if uploaded:
-    df = pd.read_csv(uploaded)
+    df = read_uploaded_csv(uploaded)
 else:
     st.info("No CSV uploaded. Using sample data.")
     df = get_sample_df()
@@ -242,22 +449,35 @@ df = ensure_columns(df)
 
 st.markdown("### ✏️ Edit data")
 edited = st.data_editor(df, num_rows="dynamic")
-# 型再整形（編集後）
-edited["FL"] = pd.to_numeric(edited["FL"], errors="coerce")
-edited["risk_level"] = edited["FL"].apply(compute_risk_level)
-edited["suggestion"] = edited.apply(lambda r: suggest_foundation(r["FL"], r.get("ground_type", "")), axis=1)
+# 型再整形（編集後）。未編集なら ensure_columns の結果をそのまま使う
+if not edited.equals(df):
+    edited = _recompute_derived(edited)
 
 st.markdown("### 📊 Preview charts")
+# 図に使う列が前回と同じなら（サイドバーの入力変更など）前回の PNG を使い回す
+preview_cols = [c for c in ("id", "FL", "lat", "lon") if c in edited.columns]
+preview_key = hashlib.sha256(
+    "\0".join(preview_cols).encode()
+    + pd.util.hash_pandas_object(edited[preview_cols], index=False).to_numpy().tobytes()
+).hexdigest()
+if st.session_state.get("_preview_key") != preview_key:
+    st.session_state["_bar_png"] = fl_bar_png(edited, preview_key, PREVIEW_DPI)
+    st.session_state["_loc_png"] = locations_png(edited, preview_key, PREVIEW_DPI)
+    st.session_state["_preview_key"] = preview_key
 col1, col2 = st.columns(2)
 with col1:
-    st.image(plot_fl_bar(edited), caption="FL value by site")
+    st.image(st.session_state["_bar_png"], caption="FL value by site")
 with col2:
-    st.image(plot_locations_scatter(edited), caption="Site locations (scatter)")
+    st.image(st.session_state["_loc_png"], caption="Site locations (scatter)")
 
 st.markdown("---")
 if st.button("📄 Generate PDF booklet"):
     try:
-        pdf_bytes = build_pdf_booklet(edited, project_name, author, report_date)
+        cache_key = _pdf_cache_key(edited, project_name, author, report_date)
+        pdf_bytes = _pdf_cache_get(cache_key)
+        if pdf_bytes is None:
+            pdf_bytes = _cached_pdf(cache_key, edited, project_name, author, report_date)
+            _pdf_cache_put(cache_key, pdf_bytes)
         st.success("PDF generated.")
         st.download_button(
             "📥 Download report",
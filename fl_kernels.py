@@ -0,0 +1,42 @@
+# FL 判定の numba カーネル（任意依存）
+# app.py は Streamlit の再実行ごとに評価し直されるため、JIT 関数をそこに置くと毎回コンパイルされる。
+# 通常の import で読み込まれるこのモジュールに置けばプロセス内で 1 回だけ、
+# cache=True により再起動後もディスク上のコンパイル結果が使われる。
+import threading
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba は任意（大規模な調査データのときだけ使う）
+    njit = None
+
+classify_kernel = None
+
+# Streamlit はセッションごとに別スレッドで実行する。numba の workqueue スレッド層
+# （TBB / OpenMP が無い環境での既定）は並列領域を複数スレッドから同時に起動すると
+# プロセスごと異常終了するため、カーネルの呼び出しは 1 スレッドずつに制限する
+_KERNEL_LOCK = threading.Lock()
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _classify_kernel(fl, soft, out_risk, out_sug):
+        # 出力は app.RISK_LEVELS / app.FOUNDATIONS の並びのインデックス
+        for i in prange(fl.size):
+            x = fl[i]
+            if np.isnan(x):
+                out_risk[i] = 3
+                out_sug[i] = 4
+            elif x < 0.75:
+                out_risk[i] = 0
+                out_sug[i] = 0
+            elif x < 1.0:
+                out_risk[i] = 1
+                out_sug[i] = 1
+            else:
+                out_risk[i] = 2
+                out_sug[i] = 2 if soft[i] else 3
+
+    def classify_kernel(fl, soft, out_risk, out_sug):
+        with _KERNEL_LOCK:
+            _classify_kernel(fl, soft, out_risk, out_sug)